@@ -1,19 +1,85 @@
 # --- COMPLETE SERVER WITH GUILDS ---
-# Requires: pip install websockets
+# Requires: pip install websockets orjson
+# Optional: pip install uvloop (faster event loop, not available on Windows)
 import asyncio
+import logging
 import websockets
-import json
-from datetime import datetime
+from websockets.frames import Frame, Opcode
+from websockets.protocol import State
+import orjson
 import os
 import sys
+import time
 import uuid
+import zlib
+from collections import defaultdict, deque
+from logging.handlers import QueueHandler, QueueListener
+from queue import SimpleQueue
+
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
+
+__all__ = [
+    'CONNECTED_USERS', 'GUILDS', 'MESSAGE_HISTORY', 'VOICE_STATE', 'SCREEN_STATE',
+    'GUILD_MEMBER_SOCKETS', 'USER_GUILDS', 'INVITE_INDEX',
+    'User', 'create_guild', 'join_guild', 'handle_new_user', 'unregister_user',
+    'queue_for', 'broadcast_to_guild', 'broadcast_compressed', 'forward_to_guild', 'write_to_guild',
+    'server_handler', 'setup_logging', 'main',
+]
+
+log = logging.getLogger(__name__)
 
 # Server state
-CONNECTED_USERS = {}  # websocket -> user_data
+CONNECTED_USERS = {}  # websocket -> User
 GUILDS = {}  # guild_id -> guild_data
-MESSAGE_HISTORY = {}  # guild_id -> [messages]
+MESSAGE_HISTORY = {}  # guild_id -> deque of the last HISTORY_SIZE messages
 VOICE_STATE = {}  # guild_id -> {user: True}
 SCREEN_STATE = {}  # guild_id -> {user: True}
+GUILD_MEMBER_SOCKETS = {}  # guild_id -> {websocket} currently viewing the guild
+USER_GUILDS = defaultdict(dict)  # username -> {guild_id: None}, in join order
+INVITE_INDEX = {}  # invite_code -> guild_id
+USER_EVENT_CACHE = {}  # (msg_type, username) -> encoded presence event
+
+HISTORY_SIZE = 500  # older messages are discarded, not persisted
+OUT_QUEUE_SIZE = 128  # max pending outbound messages per client
+MEDIA_QUEUE_LIMIT = OUT_QUEUE_SIZE // 2  # rest of the queue is kept for state messages
+WRITE_HIGH_WATER = 64 * 1024  # write_limit given to serve(); skip media above it
+
+# Binary media frames: [tag:1][sender_len:1][sender:utf-8][payload]
+MEDIA_VOICE = 0x01
+MEDIA_SCREEN = 0x02
+
+# Backed-up voice frames are coalesced as [MEDIA_BATCH]([len:4][frame])*
+MEDIA_BATCH = 0x04
+MAX_BATCH = 16
+
+# JSON payloads at least this large are sent as [ZLIB_JSON][zlib data]
+ZLIB_JSON = 0x03
+COMPRESS_MIN_SIZE = 1024
+
+class User:
+    """State for one connected client, stored in CONNECTED_USERS."""
+    __slots__ = ('ws', 'username', 'guild_id', 'out_queue', 'send_task', 'close_task')
+    
+    def __init__(self, ws, username):
+        self.ws = ws
+        self.username = username
+        self.guild_id = None  # guild the client is currently viewing
+        self.out_queue = asyncio.Queue(maxsize=OUT_QUEUE_SIZE)
+        self.send_task = asyncio.create_task(_send_loop(ws, self.out_queue))
+        self.close_task = None  # set when closing a client for persistent backpressure
+
+_timestamp_cache = (0, '')  # (unix second, "%H:%M:%S" for that second)
+
+def format_timestamp():
+    """Returns the local time as HH:MM:SS, formatting at most once per second."""
+    global _timestamp_cache
+    now = int(time.time())
+    if now != _timestamp_cache[0]:
+        _timestamp_cache = (now, time.strftime("%H:%M:%S", time.localtime(now)))
+    return _timestamp_cache[1]
 
 def create_guild(name, owner):
     """Create a new guild with invite code"""
@@ -27,71 +93,286 @@ def create_guild(name, owner):
         'invite_code': invite_code,
         'members': [owner]
     }
-    MESSAGE_HISTORY[guild_id] = []
+    MESSAGE_HISTORY[guild_id] = deque(maxlen=HISTORY_SIZE)
     VOICE_STATE[guild_id] = {}
     SCREEN_STATE[guild_id] = {}
+    GUILD_MEMBER_SOCKETS[guild_id] = set()
+    USER_GUILDS[owner][guild_id] = None
+    INVITE_INDEX[invite_code] = guild_id
     
     return GUILDS[guild_id]
 
 def join_guild(invite_code, username):
     """Join a guild using invite code"""
-    for guild_id, guild in GUILDS.items():
-        if guild['invite_code'] == invite_code:
-            if username not in guild['members']:
-                guild['members'].append(username)
-            return guild
-    return None
+    guild_id = INVITE_INDEX.get(invite_code)
+    if not guild_id:
+        return None
+    
+    guild = GUILDS[guild_id]
+    if username not in guild['members']:
+        guild['members'].append(username)
+        USER_GUILDS[username][guild_id] = None
+    return guild
+
+def media_sender_header(username):
+    """Returns the [sender_len][sender] bytes a user's media frames must carry."""
+    name = (username or '').encode()
+    if len(name) > 255:
+        return None  # not representable, so media from this user is never relayed
+    return bytes([len(name)]) + name
+
+def _pack_batch(frames):
+    """Packs voice frames into a single MEDIA_BATCH frame."""
+    parts = [bytes([MEDIA_BATCH])]
+    for frame in frames:
+        parts.append(len(frame).to_bytes(4, 'big'))
+        parts.append(frame)
+    return b''.join(parts)
+
+async def _send_loop(websocket, queue):
+    """Drains a client's outbound queue onto its websocket.
+    
+    Voice frames queued back to back are sent as one batch; text and
+    state messages are always sent on their own as soon as they are reached.
+    Screen frames never pass through here (see write_to_guild).
+    """
+    while True:
+        message = await queue.get()
+        try:
+            if message[0] == MEDIA_VOICE and not queue.empty():
+                batch = [message]
+                message = None
+                while len(batch) < MAX_BATCH and not queue.empty():
+                    item = queue.get_nowait()
+                    if item[0] != MEDIA_VOICE:
+                        message = item
+                        break
+                    batch.append(item)
+                
+                await websocket.send(_pack_batch(batch) if len(batch) > 1 else batch[0])
+                if message is None:
+                    continue
+            
+            await websocket.send(message)
+        except websockets.exceptions.ConnectionClosed:
+            return
+        except Exception as e:
+            log.warning("Failed to send to a user: %s", e)
 
 async def handle_new_user(websocket, username):
     """Adds a new user to the set of connected users."""
-    CONNECTED_USERS[websocket] = {'username': username, 'guild': None}
-    print(f"User connected: {username}. Total users: {len(CONNECTED_USERS)}")
+    CONNECTED_USERS[websocket] = User(websocket, username)
+    log.info("User connected: %s. Total users: %d", username, len(CONNECTED_USERS))
 
 async def unregister_user(websocket):
     """Removes a user from the connected set upon disconnection."""
     if websocket in CONNECTED_USERS:
-        user_data = CONNECTED_USERS[websocket]
-        username = user_data['username']
-        guild_id = user_data.get('guild')
+        user = CONNECTED_USERS[websocket]
+        username = user.username
+        guild_id = user.guild_id
         
         # Remove from voice/screen state
         if guild_id:
             if guild_id in VOICE_STATE and username in VOICE_STATE[guild_id]:
                 del VOICE_STATE[guild_id][username]
-                await broadcast_to_guild(guild_id, {
-                    'type': 'voice_leave',
-                    'sender': username
-                }, None)
+                forward_to_guild(guild_id, user_event('voice_leave', username), websocket)
             
             if guild_id in SCREEN_STATE and username in SCREEN_STATE[guild_id]:
                 del SCREEN_STATE[guild_id][username]
-                await broadcast_to_guild(guild_id, {
-                    'type': 'screen_stop',
-                    'sender': username
-                }, None)
+                forward_to_guild(guild_id, user_event('screen_stop', username), websocket)
+        
+            GUILD_MEMBER_SOCKETS[guild_id].discard(websocket)
         
+        for msg_type in ('voice_join', 'voice_leave', 'screen_start', 'screen_stop'):
+            USER_EVENT_CACHE.pop((msg_type, username), None)
+        
+        user.send_task.cancel()
         del CONNECTED_USERS[websocket]
-        print(f"User disconnected: {username}. Total users: {len(CONNECTED_USERS)}")
+        log.info("User disconnected: %s. Total users: %d", username, len(CONNECTED_USERS))
+
+def broadcast_to_guild(guild_id, message_data, sender_websocket=None, droppable=False):
+    """Queues a message for all users in a specific guild except sender."""
+    # Serialized once; bytes go out as-is with no per-recipient encode
+    forward_to_guild(guild_id, orjson.dumps(message_data), sender_websocket, droppable)
 
-async def broadcast_to_guild(guild_id, message_data, sender_websocket=None):
-    """Sends a message to all users in a specific guild except sender."""
-    message_json = json.dumps(message_data)
+def user_event(msg_type, username):
+    """Returns the encoded {'type', 'sender'} presence event for a user."""
+    key = (msg_type, username)
+    payload = USER_EVENT_CACHE.get(key)
+    if payload is None:
+        payload = USER_EVENT_CACHE[key] = orjson.dumps({'type': msg_type, 'sender': username})
+    return payload
+
+def encode_compressed(message_data):
+    """Serializes a message, deflating it once if it is large enough to gain."""
+    payload = orjson.dumps(message_data)
+    if len(payload) < COMPRESS_MIN_SIZE:
+        return payload
+    return bytes([ZLIB_JSON]) + zlib.compress(payload, 1)
+
+def broadcast_compressed(guild_id, message_data, sender_websocket=None):
+    """Like broadcast_to_guild, but compresses the payload once for everyone."""
+    forward_to_guild(guild_id, encode_compressed(message_data), sender_websocket)
+
+def queue_for(user, payload, droppable=False):
+    """Queues already-encoded bytes for one client.
     
-    # Get all users in this guild except sender
-    users_to_send = [
-        ws for ws, data in CONNECTED_USERS.items() 
-        if data.get('guild') == guild_id and ws != sender_websocket
-    ]
+    Droppable (media) payloads are skipped once a client has MEDIA_QUEUE_LIMIT
+    messages pending or a full write buffer, which keeps the rest of the queue
+    free for state messages. A client that cannot keep up even with those is
+    disconnected, since silently losing state updates would leave it out of sync.
+    """
+    if user.close_task is not None:
+        return
     
-    if users_to_send:
-        results = await asyncio.gather(
-            *[user.send(message_json) for user in users_to_send],
-            return_exceptions=True
-        )
+    queue = user.out_queue
+    if droppable:
+        if (queue.qsize() < MEDIA_QUEUE_LIMIT
+                and user.ws.transport.get_write_buffer_size() <= WRITE_HIGH_WATER):
+            queue.put_nowait(payload)
+        return
+    
+    try:
+        queue.put_nowait(payload)
+    except asyncio.QueueFull:
+        log.warning("Send queue full for %s, disconnecting", user.username)
+        user.close_task = asyncio.create_task(user.ws.close(1013, 'Client too slow'))
+
+def forward_to_guild(guild_id, payload, sender_websocket=None, droppable=False):
+    """Queues already-encoded bytes for all users in a guild except sender."""
+    for ws in GUILD_MEMBER_SOCKETS[guild_id]:
+        if ws != sender_websocket:
+            queue_for(CONNECTED_USERS[ws], payload, droppable)
+
+def write_to_guild(guild_id, payload, sender_websocket=None):
+    """Writes a binary frame straight to the transports of a guild except sender.
+    
+    The frame is built once and bypasses the send queues, so it may overtake
+    messages still queued for a client. This is only safe because the server
+    runs without compression extensions; it is used for screen frames, which
+    are large and droppable like any other media. Clients being closed, or with
+    more than the protocol's write_limit still unsent, are skipped.
+    """
+    framed = Frame(Opcode.BINARY, payload).serialize(mask=False)
+    for ws in GUILD_MEMBER_SOCKETS[guild_id]:
+        if (ws == sender_websocket or ws.state is not State.OPEN
+                or CONNECTED_USERS[ws].close_task is not None):
+            continue
+        transport = ws.transport
+        if transport.get_write_buffer_size() <= WRITE_HIGH_WATER:
+            transport.write(framed)
+
+# Replies go through the client's send queue, like broadcasts, so every
+# client sees its messages in a single order.
+
+async def _handle_create_guild(websocket, data, username):
+    guild = create_guild(data['name'], username)
+    queue_for(CONNECTED_USERS[websocket], orjson.dumps({
+        'type': 'guild_created',
+        'guild': guild
+    }))
+
+async def _handle_join_guild(websocket, data, username):
+    guild = join_guild(data['invite_code'], username)
+    if guild:
+        queue_for(CONNECTED_USERS[websocket], orjson.dumps({
+            'type': 'guild_joined',
+            'guild': guild
+        }))
+    else:
+        queue_for(CONNECTED_USERS[websocket], orjson.dumps({
+            'type': 'error',
+            'message': 'Invalid invite code'
+        }))
+
+async def _handle_switch_guild(websocket, data, username):
+    guild_id = data['guild_id']
+    if guild_id in GUILDS and username in GUILDS[guild_id]['members']:
+        user = CONNECTED_USERS[websocket]
+        previous_guild = user.guild_id
+        if previous_guild:
+            GUILD_MEMBER_SOCKETS[previous_guild].discard(websocket)
+        GUILD_MEMBER_SOCKETS[guild_id].add(websocket)
+        user.guild_id = guild_id
+        
+        # Queued behind anything still pending from the previous guild, so
+        # the client applies this state last.
+        # Send message history (orjson cannot serialize a deque)
+        history = list(MESSAGE_HISTORY.get(guild_id, ()))
+        queue_for(user, encode_compressed({
+            'type': 'message_history',
+            'messages': history
+        }))
         
-        for user, result in zip(users_to_send, results):
-            if isinstance(result, Exception):
-                print(f"Failed to send to a user: {result}")
+        # Send current voice state
+        voice_users = list(VOICE_STATE.get(guild_id, {}).keys())
+        queue_for(user, orjson.dumps({
+            'type': 'voice_state',
+            'users': voice_users
+        }))
+        
+        # Send current screen share state
+        screen_users = list(SCREEN_STATE.get(guild_id, {}).keys())
+        queue_for(user, orjson.dumps({
+            'type': 'screen_state',
+            'users': screen_users
+        }))
+
+async def _handle_text(websocket, data, username):
+    guild_id = CONNECTED_USERS[websocket].guild_id
+    if guild_id:
+        data['timestamp'] = format_timestamp()
+        MESSAGE_HISTORY[guild_id].append(data)
+        broadcast_compressed(guild_id, data, websocket)
+
+async def _handle_voice_join(websocket, data, username):
+    guild_id = CONNECTED_USERS[websocket].guild_id
+    if guild_id:
+        VOICE_STATE[guild_id][username] = True
+        forward_to_guild(guild_id, user_event('voice_join', username), websocket)
+
+async def _handle_voice_leave(websocket, data, username):
+    guild_id = CONNECTED_USERS[websocket].guild_id
+    if guild_id and username in VOICE_STATE[guild_id]:
+        del VOICE_STATE[guild_id][username]
+        forward_to_guild(guild_id, user_event('voice_leave', username), websocket)
+
+async def _handle_screen_start(websocket, data, username):
+    guild_id = CONNECTED_USERS[websocket].guild_id
+    if guild_id:
+        SCREEN_STATE[guild_id][username] = True
+        forward_to_guild(guild_id, user_event('screen_start', username), websocket)
+
+async def _handle_screen_stop(websocket, data, username):
+    guild_id = CONNECTED_USERS[websocket].guild_id
+    if guild_id and username in SCREEN_STATE[guild_id]:
+        del SCREEN_STATE[guild_id][username]
+        forward_to_guild(guild_id, user_event('screen_stop', username), websocket)
+
+async def _handle_media(websocket, data, username):
+    """Relays a JSON voice_data/screen_frame from clients predating binary media."""
+    guild_id = CONNECTED_USERS[websocket].guild_id
+    if guild_id:
+        # Rebuilt so the sender is the authenticated user, as for binary media
+        broadcast_to_guild(guild_id, {
+            'type': data['type'],
+            'sender': username,
+            'content': data.get('content')
+        }, websocket, droppable=True)
+
+# msg_type -> async handler(websocket, data, username)
+HANDLERS = {
+    'create_guild': _handle_create_guild,
+    'join_guild': _handle_join_guild,
+    'switch_guild': _handle_switch_guild,
+    'text': _handle_text,
+    'voice_join': _handle_voice_join,
+    'voice_leave': _handle_voice_leave,
+    'voice_data': _handle_media,
+    'screen_start': _handle_screen_start,
+    'screen_stop': _handle_screen_stop,
+    'screen_frame': _handle_media,
+}
 
 async def server_handler(websocket): 
     """The main handler for a new client connection."""
@@ -100,7 +381,7 @@ async def server_handler(websocket):
     try:
         # Wait for initial auth message
         auth_msg = await websocket.recv()
-        auth_data = json.loads(auth_msg)
+        auth_data = orjson.loads(auth_msg)
         
         if auth_data.get('type') != 'auth':
             await websocket.close()
@@ -111,124 +392,73 @@ async def server_handler(websocket):
         
         # Send initial guild list
         guild_list = [
-            {'id': g['id'], 'name': g['name'], 'invite_code': g['invite_code']}
-            for g in GUILDS.values()
-            if username in g['members']
+            {'id': gid, 'name': GUILDS[gid]['name'], 'invite_code': GUILDS[gid]['invite_code']}
+            for gid in USER_GUILDS.get(username, ())
         ]
-        await websocket.send(json.dumps({
+        queue_for(CONNECTED_USERS[websocket], orjson.dumps({
             'type': 'guild_list',
             'guilds': guild_list
         }))
         
-        async for message_json in websocket:
+        # Bound once as locals: the loop below runs for every inbound frame
+        user = CONNECTED_USERS[websocket]
+        sender_header = media_sender_header(username)
+        loads = orjson.loads
+        get_handler = HANDLERS.get
+        forward = forward_to_guild
+        write = write_to_guild
+        
+        async for message in websocket:
             try:
-                data = json.loads(message_json)
-                msg_type = data.get('type')
-                
-                if msg_type == 'create_guild':
-                    guild = create_guild(data['name'], username)
-                    await websocket.send(json.dumps({
-                        'type': 'guild_created',
-                        'guild': guild
-                    }))
+                if isinstance(message, bytes):
+                    # Media frames are relayed verbatim once the sender in
+                    # their header is checked against the authenticated user
+                    guild_id = user.guild_id
+                    if guild_id and sender_header and message.startswith(sender_header, 1):
+                        if message[0] == MEDIA_SCREEN:
+                            write(guild_id, message, websocket)
+                        elif message[0] == MEDIA_VOICE:
+                            forward(guild_id, message, websocket, droppable=True)
+                    continue
                 
-                elif msg_type == 'join_guild':
-                    guild = join_guild(data['invite_code'], username)
-                    if guild:
-                        await websocket.send(json.dumps({
-                            'type': 'guild_joined',
-                            'guild': guild
-                        }))
-                    else:
-                        await websocket.send(json.dumps({
-                            'type': 'error',
-                            'message': 'Invalid invite code'
-                        }))
-                
-                elif msg_type == 'switch_guild':
-                    guild_id = data['guild_id']
-                    if guild_id in GUILDS and username in GUILDS[guild_id]['members']:
-                        CONNECTED_USERS[websocket]['guild'] = guild_id
-                        
-                        # Send message history
-                        history = MESSAGE_HISTORY.get(guild_id, [])
-                        await websocket.send(json.dumps({
-                            'type': 'message_history',
-                            'messages': history
-                        }))
-                        
-                        # Send current voice state
-                        voice_users = list(VOICE_STATE.get(guild_id, {}).keys())
-                        await websocket.send(json.dumps({
-                            'type': 'voice_state',
-                            'users': voice_users
-                        }))
-                        
-                        # Send current screen share state
-                        screen_users = list(SCREEN_STATE.get(guild_id, {}).keys())
-                        await websocket.send(json.dumps({
-                            'type': 'screen_state',
-                            'users': screen_users
-                        }))
-                
-                elif msg_type == 'text':
-                    guild_id = CONNECTED_USERS[websocket].get('guild')
-                    if guild_id:
-                        data['timestamp'] = datetime.now().strftime("%H:%M:%S")
-                        MESSAGE_HISTORY[guild_id].append(data)
-                        await broadcast_to_guild(guild_id, data, websocket)
-                
-                elif msg_type == 'voice_join':
-                    guild_id = CONNECTED_USERS[websocket].get('guild')
-                    if guild_id:
-                        VOICE_STATE[guild_id][username] = True
-                        await broadcast_to_guild(guild_id, data, websocket)
-                
-                elif msg_type == 'voice_leave':
-                    guild_id = CONNECTED_USERS[websocket].get('guild')
-                    if guild_id and username in VOICE_STATE[guild_id]:
-                        del VOICE_STATE[guild_id][username]
-                        await broadcast_to_guild(guild_id, data, websocket)
-                
-                elif msg_type == 'voice_data':
-                    guild_id = CONNECTED_USERS[websocket].get('guild')
-                    if guild_id:
-                        await broadcast_to_guild(guild_id, data, websocket)
-                
-                elif msg_type == 'screen_start':
-                    guild_id = CONNECTED_USERS[websocket].get('guild')
-                    if guild_id:
-                        SCREEN_STATE[guild_id][username] = True
-                        await broadcast_to_guild(guild_id, data, websocket)
-                
-                elif msg_type == 'screen_stop':
-                    guild_id = CONNECTED_USERS[websocket].get('guild')
-                    if guild_id and username in SCREEN_STATE[guild_id]:
-                        del SCREEN_STATE[guild_id][username]
-                        await broadcast_to_guild(guild_id, data, websocket)
-                
-                elif msg_type == 'screen_frame':
-                    guild_id = CONNECTED_USERS[websocket].get('guild')
-                    if guild_id:
-                        await broadcast_to_guild(guild_id, data, websocket)
+                data = loads(message)
+                handler = get_handler(data.get('type'))
+                if handler:
+                    await handler(websocket, data, username)
                         
-            except json.JSONDecodeError as e:
-                print(f"Invalid JSON received: {e}")
+            except orjson.JSONDecodeError as e:
+                log.warning("Invalid JSON received: %s", e)
             except Exception as e:
-                print(f"Error processing message: {e}")
+                log.error("Error processing message: %s", e)
                 
     except websockets.exceptions.ConnectionClosedOK:
-        print("User connection closed normally.")
+        log.info("User connection closed normally.")
     except websockets.exceptions.ConnectionClosedError as e:
-        print(f"User connection closed with error: {e}")
+        log.info("User connection closed with error: %s", e)
     except Exception as e:
-        print(f"Unexpected error in handler: {e}")
+        log.error("Unexpected error in handler: %s", e)
     finally:
         await unregister_user(websocket)
 
+def setup_logging():
+    """Logs through a queue so stream writes happen off the event loop."""
+    log_queue = SimpleQueue()
+    root = logging.getLogger()
+    root.setLevel(logging.INFO)
+    root.addHandler(QueueHandler(log_queue))
+    
+    handler = logging.StreamHandler()
+    handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(message)s"))
+    listener = QueueListener(log_queue, handler)
+    listener.start()
+    
+    # websockets logs every handshake at INFO
+    logging.getLogger('websockets').setLevel(logging.WARNING)
+    return listener
+
 async def main():
-    print(f"Running server file from: {os.path.abspath(sys.argv[0])}")
-    print("Starting WebSocket server with guilds...")
+    log.info("Running server file from: %s", os.path.abspath(sys.argv[0]))
+    log.info("Starting WebSocket server with guilds...")
     
     await asyncio.sleep(0.5)
     
@@ -241,28 +471,37 @@ async def main():
             port,
             ping_interval=20,
             ping_timeout=10,
+            compression=None,  # large payloads are deflated once per broadcast
+            write_limit=WRITE_HIGH_WATER,
             max_size=50 * 1024 * 1024  # 50MB for screen/audio
         )
         
-        print(f"Server started on ws://0.0.0.0:{port}")
-        print("Press Ctrl+C to stop")
+        log.info("Server started on ws://0.0.0.0:%d", port)
+        log.info("Press Ctrl+C to stop")
         
         await asyncio.Future()
     except OSError as e:
         if e.errno == 98 or e.errno == 48:
-            print(f"\nError: Port {port} is already in use!")
+            log.error("Port %d is already in use!", port)
         else:
-            print(f"OS Error: {e}")
+            log.error("OS Error: %s", e)
         raise
     except Exception as e:
-        print(f"Failed to start server: {e}")
+        log.error("Failed to start server: %s", e)
         raise
 
 if __name__ == "__main__":
+    # Must be installed before asyncio.run() creates the loop
+    if uvloop is not None:
+        uvloop.install()
+    
+    listener = setup_logging()
     try:
         asyncio.run(main())
     except KeyboardInterrupt:
-        print("\nServer shutting down gracefully...")
+        log.info("Server shutting down gracefully...")
     except Exception as e:
-        print(f"\nServer crashed: {e}")
+        log.error("Server crashed: %s", e)
         sys.exit(1)
+    finally:
+        listener.stop()